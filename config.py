@@ -1,10 +1,50 @@
 # Configuration constants for the MCP Chroma Memory Server
+import os
 
 # Gemini Models
 EMBEDDING_MODEL_NAME = "models/embedding-001"
 # Using the specific experimental model identifier provided by the user
 GENERATION_MODEL_NAME = "gemini-2.5-pro-exp-03-25"
+# Truncate embeddings to this many dimensions to shrink the index and stored
+# vectors (e.g. 256 with "models/text-embedding-004"). None keeps the model's
+# full size. Existing collections only accept vectors of the size they were
+# created with, so changing this requires a new collection.
+EMBEDDING_OUTPUT_DIMENSIONALITY = None
+# Maximum number of texts sent in a single batchEmbedContents request
+GEMINI_EMBED_BATCH_LIMIT = 100
+# In-process LRU cache of (task_type, text) embeddings; set
+# EMBEDDING_CACHE_ENABLED=0 in the environment to turn it off
+EMBEDDING_CACHE_ENABLED = os.environ.get("EMBEDDING_CACHE_ENABLED", "1") != "0"
+EMBEDDING_CACHE_SIZE = 10_000
+# Maximum embedding requests the bulk-insert path keeps in flight at once
+EMBEDDING_MAX_CONCURRENCY = 32
 
 # ChromaDB Settings
 DEFAULT_COLLECTION_NAME = "agent_memory"
 DB_SUBDIR = "chroma_db_data"  # Subdirectory within the project for DB persistence
+# HNSW index parameters applied when a collection is first created
+COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:construction_ef": 200,
+    "hnsw:M": 32,
+}
+# Maximum number of collection handles kept in database's handle cache
+COLLECTION_CACHE_SIZE = 128
+# Number of documents written per collection.add call in bulk inserts
+CHROMA_ADD_BATCH_SIZE = 128
+# add_memory calls arriving while another add is being written are coalesced
+# into one add_memories call of at most ADD_MEMORY_COALESCE_MAX items
+ADD_MEMORY_COALESCE_MAX = 64
+
+# Collection Summarization
+# Documents recalled as context when summarize_collection is given a query
+SUMMARY_MAX_CONTEXT_DOCS = 20
+# Documents fetched and summarized per page when no query is given
+SUMMARY_PAGE_SIZE = 100
+# Approximate input tokens read from a collection before summarization stops
+SUMMARY_TOKEN_BUDGET = 200_000
+# Maximum page summaries generated concurrently
+SUMMARY_MAP_CONCURRENCY = 8
+# Recalled context shorter than this (in characters, roughly 200 tokens) is
+# returned as-is by summarize_memory instead of being sent to the model
+SUMMARY_SHORTCIRCUIT_CHARS = 800
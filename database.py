@@ -1,7 +1,11 @@
 import os
 import sys
 import logging
+import functools
+import threading
+from collections import OrderedDict
 import chromadb
+from chromadb.errors import InvalidCollectionException
 import config
 from decorators import handle_errors_as_mcp
 
@@ -16,13 +20,92 @@ except Exception as e:
     logger.error(f"Failed to initialize ChromaDB client: {e}")
     sys.exit(1)
 
+# --- SQLite Tuning ---
+
+
+def _enable_wal() -> None:
+    """
+    Reaches into Chroma's private sysdb to switch the database to WAL journaling,
+    which lets readers proceed during writes. journal_mode persists in the file,
+    unlike per-connection pragmas that wouldn't reach Chroma's per-thread pool.
+    """
+    try:
+        conn = chroma_client._server._sysdb._conn_pool.connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        logger.info("ChromaDB SQLite journal mode set to WAL.")
+    except Exception as e:
+        logger.warning(f"Could not apply SQLite pragmas to ChromaDB: {e}")
+
+
+_enable_wal()
+
 
 # --- Helper Functions ---
 
 
+# Collection handles by name, most recently used last, so repeat lookups skip
+# Chroma's sysdb. Bounded because names come from clients.
+_collections: OrderedDict[str, chromadb.Collection] = OrderedDict()
+_collections_lock = threading.Lock()
+
+
 @handle_errors_as_mcp
 def get_collection(collection_name: str = config.DEFAULT_COLLECTION_NAME):
     """
     Gets or creates a ChromaDB collection by name.
+    Handles are cached per name; call evict_collection() after deleting a
+    collection so a stale handle isn't served. The lookup runs under the cache
+    lock so a concurrent eviction can't be undone by a late insert.
+    """
+    with _collections_lock:
+        collection = _collections.get(collection_name)
+        if collection is None:
+            collection = chroma_client.get_or_create_collection(
+                name=collection_name, metadata=config.COLLECTION_METADATA
+            )
+            _collections[collection_name] = collection
+            if len(_collections) > config.COLLECTION_CACHE_SIZE:
+                _collections.popitem(last=False)
+        else:
+            _collections.move_to_end(collection_name)
+    return collection
+
+
+def evict_collection(collection_name: str) -> None:
     """
-    return chroma_client.get_or_create_collection(name=collection_name)
+    Drops the cached handle for a single collection.
+    """
+    with _collections_lock:
+        _collections.pop(collection_name, None)
+
+
+def _evict_stale(message: str) -> bool:
+    """
+    Drops cached handles whose collection ID appears in a Chroma error message.
+    Returns True if any handle was dropped.
+    """
+    with _collections_lock:
+        stale = [name for name, c in _collections.items() if str(c.id) in message]
+        for name in stale:
+            del _collections[name]
+    return bool(stale)
+
+
+def retry_stale_collection(func):
+    """
+    Decorator to retry the wrapped function once when it fails because a
+    cached handle points at a collection deleted since it was cached. The
+    stale handle is evicted first, so the retry looks the collection up again.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except InvalidCollectionException as e:
+            if not _evict_stale(str(e)):
+                raise
+            logger.warning(f"Retrying '{func.__name__}' after stale collection: {e}")
+            return func(*args, **kwargs)
+
+    return wrapper
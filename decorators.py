@@ -1,10 +1,13 @@
 from copy import copy
+import inspect
 import logging
 import functools
+import threading
 from mcp import McpError
 
 logger = logging.getLogger(__name__)
 _privilege_granted = False  # Module-level state variable
+_privilege_lock = threading.Lock()  # Guards check-and-clear of _privilege_granted
 
 
 class PrivilegeError(Exception):
@@ -23,8 +26,10 @@ def require_privilege(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         global _privilege_granted
-        if _privilege_granted:
+        with _privilege_lock:
+            granted = _privilege_granted
             _privilege_granted = False
+        if granted:
             return func(*args, **kwargs)
         else:
             logger.warning(
@@ -42,31 +47,69 @@ def require_privilege(func):
 def handle_errors_as_mcp(func):
     """
     Decorator to catch any exception from the wrapped function, log it,
-    and re-raise it wrapped in McpError.
+    and re-raise it wrapped in McpError. McpErrors pass through untouched.
     """
 
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
+        except McpError:
+            # Already logged and wrapped by an inner handler
+            raise
         except Exception as e:
             logger.exception(f"Error during operation '{func.__name__}': {e}")
-            if isinstance(e, McpError):
-                raise
-            else:
-                if not hasattr(e, "message"):
-                    e.message = repr(e)
-                raise McpError(e)
+            if not hasattr(e, "message"):
+                e.message = repr(e)
+            raise McpError(e)
 
     return wrapper
 
 
+def require_nonempty(*names):
+    """
+    Decorator factory to raise ValueError before the wrapped function runs if
+    any of the named arguments is empty. Apply it below handle_errors_as_mcp
+    so the error is wrapped in McpError like any other.
+    """
+
+    def decorator(func):
+        parameters = list(inspect.signature(func).parameters.values())
+        positions = {parameter.name: i for i, parameter in enumerate(parameters)}
+        # (name, positional index, default) resolved once, not per call
+        checks = []
+        for name in names:
+            parameter = parameters[positions[name]]
+            default = parameter.default
+            if default is inspect.Parameter.empty:
+                default = None
+            checks.append((name, positions[name], default))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for name, position, default in checks:
+                if name in kwargs:
+                    value = kwargs[name]
+                elif position < len(args):
+                    value = args[position]
+                else:
+                    value = default
+                if not value:
+                    raise ValueError(f"{name} cannot be empty.")
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 def grant_privilege() -> bool:
     """
     Grants temporary privilege for the next sensitive operation.
     Returns True.
     """
     global _privilege_granted
-    _privilege_granted = True
+    with _privilege_lock:
+        _privilege_granted = True
     logger.info("Temporary privilege granted for next sensitive operation.")
     return True
@@ -1,6 +1,11 @@
 import os
 import sys
 import logging
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from collections.abc import Iterator
+import numpy as np
 import config
 import google.generativeai as genai
 
@@ -17,50 +22,180 @@ except KeyError:
     logger.error("GEMINI_API_KEY environment variable not set or empty.")
     sys.exit(1)
 
+# Built once at import and reused by every summarization call
+_GENERATION_MODEL = genai.GenerativeModel(config.GENERATION_MODEL_NAME)
+
+# --- Embedding Cache ---
+# Keyed on (task_type, blake2b digest of the text) so long texts don't pin
+# their full contents in memory. Values are read-only float32 arrays, about a
+# quarter the size of a list of Python floats.
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+_embedding_cache: OrderedDict[tuple[str, bytes], np.ndarray] = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+_cache_hits = 0
+_cache_misses = 0
+
+
+def _cache_key(text: str, task_type: str) -> tuple[str, bytes]:
+    return task_type, hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def _cache_get(key: tuple[str, bytes]) -> np.ndarray | None:
+    global _cache_hits, _cache_misses
+    if not config.EMBEDDING_CACHE_ENABLED:
+        return None
+    with _embedding_cache_lock:
+        embedding = _embedding_cache.get(key)
+        if embedding is not None:
+            _embedding_cache.move_to_end(key)
+            _cache_hits += 1
+        else:
+            _cache_misses += 1
+        return embedding
+
+
+def _cache_put(key: tuple[str, bytes], embedding: np.ndarray) -> None:
+    if not config.EMBEDDING_CACHE_ENABLED:
+        return
+    with _embedding_cache_lock:
+        _embedding_cache[key] = embedding
+        _embedding_cache.move_to_end(key)
+        while len(_embedding_cache) > config.EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+
+
+def _cache_clear() -> None:
+    global _cache_hits, _cache_misses
+    with _embedding_cache_lock:
+        _embedding_cache.clear()
+        _cache_hits = _cache_misses = 0
+
+
+def _cache_info() -> CacheInfo:
+    with _embedding_cache_lock:
+        return CacheInfo(
+            _cache_hits,
+            _cache_misses,
+            config.EMBEDDING_CACHE_SIZE,
+            len(_embedding_cache),
+        )
+
+
 # --- Helper Functions ---
 
+_VALID_TASK_TYPES = frozenset(
+    (
+        "RETRIEVAL_DOCUMENT",
+        "RETRIEVAL_QUERY",
+        "SEMANTIC_SIMILARITY",
+        "CLASSIFICATION",
+        "CLUSTERING",
+    )
+)
+
 
-def generate_embedding(text: str, task_type: str) -> list[float]:
+def generate_embedding(text: str, task_type: str) -> np.ndarray:
     """
     Generates text embedding using the configured Gemini model.
+    Returns a 1-D float32 array.
+    """
+    return generate_embeddings([text], task_type)[0]
+
+
+def generate_embeddings(texts: list[str], task_type: str) -> np.ndarray:
     """
-    if not text or not isinstance(text, str):
+    Generates embeddings for several texts, batching them into as few
+    batchEmbedContents requests as the API allows. Returns a 2-D float32
+    array with one row per text, in input order.
+    """
+    if not texts or not all(text and isinstance(text, str) for text in texts):
         logger.error("Invalid text input for embedding.")
         raise ValueError("Invalid text provided for embedding.")
 
-    valid_task_types = [
-        "RETRIEVAL_DOCUMENT",
-        "RETRIEVAL_QUERY",
-        "SEMANTIC_SIMILARITY",
-        "CLASSIFICATION",
-        "CLUSTERING",
-    ]
-    if task_type not in valid_task_types:
+    if task_type not in _VALID_TASK_TYPES:
         logger.warning(f"Unknown task_type '{task_type}'. Using default.")
 
+    keys = [_cache_key(text, task_type) for text in texts]
+    embeddings = [_cache_get(key) for key in keys]
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        logger.debug(
+            "Embedding cache: %s/%s hits.", len(texts) - len(missing), len(texts)
+        )
+        fresh = _embed_uncached([texts[i] for i in missing], task_type)
+        for i, embedding in zip(missing, fresh):
+            embeddings[i] = np.asarray(embedding, dtype=np.float32)
+            embeddings[i].flags.writeable = False
+            _cache_put(keys[i], embeddings[i])
+    return np.stack(embeddings)
+
+
+generate_embedding.cache_clear = _cache_clear
+generate_embedding.cache_info = _cache_info
+
+
+def _embed_uncached(texts: list[str], task_type: str) -> list[list[float]]:
+    """
+    Embeds texts via Gemini in chunks of GEMINI_EMBED_BATCH_LIMIT, retrying
+    items individually when a chunk fails.
+    """
+    embeddings = []
+    limit = config.GEMINI_EMBED_BATCH_LIMIT
+    for start in range(0, len(texts), limit):
+        batch = texts[start : start + limit]
+        try:
+            embeddings.extend(_embed_batch(batch, task_type))
+        except Exception as e:
+            if len(batch) == 1:
+                raise
+            # Retry item by item so one bad input doesn't sink the whole batch
+            logger.warning(
+                f"Batch embedding of {len(batch)} texts failed ({e}). Retrying individually."
+            )
+            for text in batch:
+                embeddings.extend(_embed_batch([text], task_type))
+    return embeddings
+
+
+def _embed_batch(texts: list[str], task_type: str) -> list[list[float]]:
+    """
+    Embeds a list of texts with a single Gemini request.
+    """
     result = genai.embed_content(
-        model=config.EMBEDDING_MODEL_NAME, content=text, task_type=task_type
+        model=config.EMBEDDING_MODEL_NAME,
+        content=texts,
+        task_type=task_type,
+        output_dimensionality=config.EMBEDDING_OUTPUT_DIMENSIONALITY,
     )
-    embedding = result.get("embedding")
-    if not embedding:
-        logger.error(f"Gemini API did not return an embedding for task '{task_type}'.")
+    embeddings = result.get("embedding")
+    if not embeddings or len(embeddings) != len(texts):
+        logger.error(f"Gemini API did not return embeddings for task '{task_type}'.")
         raise RuntimeError(
             f"Gemini API failed to return embedding for task '{task_type}'."
         )
-    return embedding
+    return embeddings
 
 
 def generate_summary(context: str, query: str) -> str:
     """
     Generates a summary of the provided context using the Gemini generation model.
     """
+    summary = "".join(generate_summary_stream(context, query))
+    if not summary:
+        logger.warning("Gemini summary generation returned no content.")
+        raise ValueError("Summary generation failed (empty response from model).")
+    return summary
+
+
+def generate_summary_stream(context: str, query: str) -> Iterator[str]:
+    """
+    Streams a summary of the provided context, yielding text chunks as the
+    Gemini generation model produces them.
+    """
     prompt = f"Concisely summarize the following text relevant to the query '{query}'. Respond ONLY with the precise summary itself, without any introductory or concluding phrases:\n\n---\n{context}\n---"
     logger.info(f"Generating summary for query: '{query[:60]}...'")
 
-    model = genai.GenerativeModel(config.GENERATION_MODEL_NAME)
-    response = model.generate_content(prompt)
-    if response.parts:
-        return response.text
-    else:
-        logger.warning("Gemini summary generation returned no content.")
-        raise ValueError("Summary generation failed (empty response from model).")
+    for chunk in _GENERATION_MODEL.generate_content(prompt, stream=True):
+        if chunk.parts:
+            yield chunk.text
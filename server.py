@@ -1,10 +1,15 @@
 #!/usr/bin/env python
+import os
 import sys
+import asyncio
 import logging
+import functools
 
 from mcp.server.fastmcp import FastMCP
 import tools
 import decorators
+import database
+import llm_utils
 import config
 
 # --- Logging Setup ---
@@ -22,102 +27,21 @@ mcp = FastMCP("Chroma Memory Server")
 # --- Register Tools ---
 
 
-@mcp.tool()
-def add_memory(
-    text: str,
-    doc_id: str | None = None,
-    metadata: dict | None = None,
-    collection_name: str = config.DEFAULT_COLLECTION_NAME,
-) -> str:
-    return tools.add_memory(text, doc_id, metadata, collection_name)
-
+def _run_in_thread(func):
+    """
+    Wraps a blocking tool function as a coroutine that runs in a worker thread,
+    keeping the event loop free for concurrent requests.
+    """
 
-@mcp.tool()
-def recall_memory(
-    query: str,
-    top_k: int = 1,
-    filter: dict | None = None,
-    collection_name: str = config.DEFAULT_COLLECTION_NAME,
-) -> list[str]:
-    return tools.recall_memory(query, top_k, filter, collection_name)
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
 
-
-@mcp.tool()
-def delete_memory(
-    doc_id: str, collection_name: str = config.DEFAULT_COLLECTION_NAME
-) -> bool:
-    return tools.delete_memory(doc_id, collection_name)
+    return wrapper
 
 
-@mcp.tool()
-def summarize_memory(
-    query: str,
-    top_k: int = 5,
-    filter: dict | None = None,
-    collection_name: str = config.DEFAULT_COLLECTION_NAME,
-) -> str:
-    return tools.summarize_memory(query, top_k, filter, collection_name)
-
-
-@mcp.tool()
-def check_memory(
-    topic: str,
-    filter: dict | None = None,
-    collection_name: str = config.DEFAULT_COLLECTION_NAME,
-) -> bool:
-    return tools.check_memory(topic, filter, collection_name)
-
-
-@mcp.tool()
-def delete_collection(collection_name: str) -> bool:
-    return tools.delete_collection(collection_name)
-
-
-@mcp.tool()
-def summarize_collection(collection_name: str, query: str = "") -> str:
-    return tools.summarize_collection(collection_name, query)
-
-
-@mcp.tool()
-def update_memory_metadata(
-    doc_id: str,
-    metadata: dict,
-    collection_name: str = config.DEFAULT_COLLECTION_NAME,
-) -> bool:
-    return tools.update_memory_metadata(doc_id, metadata, collection_name)
-
-
-@mcp.tool()
-def get_memory_by_id(
-    doc_id: str, collection_name: str = config.DEFAULT_COLLECTION_NAME
-) -> str:
-    return tools.get_memory_by_id(doc_id, collection_name)
-
-
-@mcp.tool()
-def list_collections() -> list[str]:
-    return tools.list_collections()
-
-
-@mcp.tool()
-def recall_memory_with_distance(
-    query: str,
-    top_k: int = 1,
-    filter: dict | None = None,
-    collection_name: str = config.DEFAULT_COLLECTION_NAME,
-) -> list[tuple[str, float]]:
-    return tools.recall_memory_with_distance(query, top_k, filter, collection_name)
-
-
-@mcp.tool()
-def recall_memory_hybrid(
-    query: str,
-    keyword: str = None,
-    top_k: int = 1,
-    filter: dict | None = None,
-    collection_name: str = config.DEFAULT_COLLECTION_NAME,
-) -> list[str]:
-    return tools.recall_memory_hybrid(query, keyword, top_k, filter, collection_name)
+for tool_name in tools.__all__:
+    mcp.tool()(_run_in_thread(getattr(tools, tool_name)))
 
 
 @mcp.tool()
@@ -126,12 +50,29 @@ def grant_privilege() -> bool:
     return decorators.grant_privilege()
 
 
-@mcp.tool()
-def list_collection_ids(collection_name: str) -> list[str]:
-    return tools.list_collection_ids(collection_name)
+# --- Warm-up ---
+
+
+def _warm_up() -> None:
+    """
+    Loads the default collection's index and primes the Gemini client (and the
+    embedding cache) so the first real request doesn't pay for either.
+    """
+    try:
+        collection = database.get_collection(config.DEFAULT_COLLECTION_NAME)
+        embedding = llm_utils.generate_embedding("warmup", task_type="RETRIEVAL_QUERY")
+        if collection.count():
+            collection.query(
+                query_embeddings=embedding[None, :], n_results=1, include=[]
+            )
+        logger.info("Warm-up complete.")
+    except Exception as e:
+        logger.warning(f"Warm-up failed: {e}")
 
 
 # --- Run the server ---
 if __name__ == "__main__":
+    if os.environ.get("CHROMA_MCP_WARMUP") == "1":
+        _warm_up()
     logger.info("Starting Chroma Memory MCP Server...")
     mcp.run()
@@ -1,19 +1,136 @@
-import uuid
+import hashlib
 import logging
+import threading
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import database
 import llm_utils
 import config
 
-from decorators import require_privilege, handle_errors_as_mcp
+from decorators import require_privilege, handle_errors_as_mcp, require_nonempty
 
 logger = logging.getLogger(__name__)
 
+# Runs embedding requests ahead of the Chroma writes that consume them
+_embedding_executor = ThreadPoolExecutor(
+    max_workers=config.EMBEDDING_MAX_CONCURRENCY, thread_name_prefix="embed"
+)
+
+# Runs the per-page map step of summarize_collection
+_summary_executor = ThreadPoolExecutor(
+    max_workers=config.SUMMARY_MAP_CONCURRENCY, thread_name_prefix="summarize"
+)
+
+# Separator placed between documents when building a summarization prompt
+_CHUNK_SEPARATOR = "\n---\n"
+
+# Tools registered with the MCP server, in registration order
+__all__ = [
+    "add_memory",
+    "add_memories",
+    "recall_memory",
+    "delete_memory",
+    "summarize_memory",
+    "check_memory",
+    "check_memory_by_id",
+    "delete_collection",
+    "summarize_collection",
+    "update_memory_metadata",
+    "get_memory_by_id",
+    "list_collections",
+    "recall_memory_with_distance",
+    "recall_memory_hybrid",
+    "list_collection_ids",
+]
+
+
+# --- Write Coalescing ---
+
+
+class _MicroBatcher:
+    """
+    Coalesces items submitted from concurrent threads into a single call of
+    `flush`, which maps a list of items to a list of results. A lone caller
+    flushes immediately; items that arrive while a flush is running are
+    flushed together by the next caller. If a combined flush fails, items are
+    retried one by one so a bad item only fails its own caller.
+    """
+
+    def __init__(self, flush, max_size: int):
+        self._flush = flush
+        self._max_size = max_size
+        self._cond = threading.Condition()
+        self._flushing = False
+        self._pending: list[tuple[object, Future]] = []
+
+    def submit(self, item):
+        future = Future()
+        with self._cond:
+            self._pending.append((item, future))
+        while not future.done():
+            with self._cond:
+                # Wait out a running flush; it may pick up this item too
+                while self._flushing and not future.done():
+                    self._cond.wait()
+                if future.done():
+                    break
+                self._flushing = True
+                batch = self._take()
+            try:
+                self._run(batch)
+            finally:
+                with self._cond:
+                    self._flushing = False
+                    self._cond.notify_all()
+        return future.result()
+
+    def _take(self) -> list[tuple[object, Future]]:
+        batch = self._pending[: self._max_size]
+        self._pending = self._pending[self._max_size :]
+        return batch
+
+    def _run(self, batch: list[tuple[object, Future]]) -> None:
+        try:
+            results = self._flush([item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            for entry in batch:
+                self._run([entry])
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+_add_batchers: dict[str, _MicroBatcher] = {}
+_add_batchers_lock = threading.Lock()
+
+
+def _get_add_batcher(collection_name: str) -> _MicroBatcher:
+    with _add_batchers_lock:
+        if collection_name not in _add_batchers:
+            _add_batchers[collection_name] = _MicroBatcher(
+                lambda items: add_memories(items, collection_name),
+                max_size=config.ADD_MEMORY_COALESCE_MAX,
+            )
+        return _add_batchers[collection_name]
+
+
+def _content_id(text: str) -> str:
+    """
+    Default document ID derived from the text, so identical texts share an ID.
+    """
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
 
 # --- Tool Logic Implementation ---
 
 
 @handle_errors_as_mcp
+@require_nonempty("text")
 def add_memory(
     text: str,
     doc_id: str | None = None,
@@ -21,33 +138,108 @@ def add_memory(
     collection_name: str = config.DEFAULT_COLLECTION_NAME,
 ) -> str:
     """
-    Core logic for adding/updating a memory document.
+    Core logic for adding/updating a memory document. Calls arriving while
+    another add is being written are coalesced into one add_memories batch.
     Returns doc_id on success. Raises McpError on failure.
     """
-    logger.debug(f"Executing add_memory logic for collection '{collection_name}'")
-    if not text:
-        raise ValueError("Text content cannot be empty.")
+    logger.debug("Executing add_memory logic for collection '%s'", collection_name)
+    # Concurrent single adds share one embedding request and one Chroma write
+    item = {"text": text, "doc_id": doc_id, "metadata": metadata}
+    return _get_add_batcher(collection_name).submit(item)
 
-    final_doc_id = doc_id if doc_id else uuid.uuid4().hex
-    logger.debug(f"Using doc_id '{final_doc_id}'")
 
+@handle_errors_as_mcp
+@database.retry_stale_collection
+@require_nonempty("items")
+def add_memories(
+    items: list[dict],
+    collection_name: str = config.DEFAULT_COLLECTION_NAME,
+) -> list[str]:
+    """
+    Core logic for adding/updating several memory documents at once.
+    Each item is a dict with a required 'text' and optional 'doc_id' and 'metadata'.
+    Returns the doc_ids in input order. Raises McpError on failure.
+    """
+    logger.debug("Executing add_memories logic for collection '%s'", collection_name)
+    doc_ids, texts, metadatas = [], [], []
+    for item in items:
+        if not isinstance(item, dict) or not item.get("text"):
+            raise ValueError("Text content cannot be empty.")
+        # Identical texts map to the same default ID, so re-adds are no-ops
+        doc_ids.append(item.get("doc_id") or _content_id(item["text"]))
+        texts.append(item["text"])
+        # Chroma rejects empty metadata dicts, so store None instead
+        metadatas.append(item.get("metadata") or None)
+
+    # Chroma's add ignores IDs that already exist and rejects repeated IDs in
+    # one call, so only embed and write the first occurrence of each new ID.
+    # Metadata given with any other occurrence is applied by an update, which
+    # needs no embedding.
     memory_collection = database.get_collection(collection_name)
-    embedding = llm_utils.generate_embedding(text, task_type="RETRIEVAL_DOCUMENT")
-
-    final_metadata = {"original_text": text}
-    if metadata:
-        final_metadata.update(metadata)
-
-    memory_collection.add(
-        ids=[final_doc_id], embeddings=[embedding], metadatas=[final_metadata]
-    )
+    unique_ids = list(dict.fromkeys(doc_ids))
+    skip = set(memory_collection.get(ids=unique_ids, include=[])["ids"])
+    new_ids, new_texts, new_metadatas = [], [], []
+    metadata_updates: dict[str, dict] = {}
+    for doc_id, text, metadata in zip(doc_ids, texts, metadatas):
+        if doc_id not in skip:
+            skip.add(doc_id)
+            new_ids.append(doc_id)
+            new_texts.append(text)
+            new_metadatas.append(metadata)
+        elif metadata is not None:
+            metadata_updates[doc_id] = metadata
+
+    if new_ids:
+        _add_embedded(memory_collection, new_ids, new_texts, new_metadatas)
+    if metadata_updates:
+        memory_collection.update(
+            ids=list(metadata_updates), metadatas=list(metadata_updates.values())
+        )
     logger.info(
-        f"Successfully added/updated document '{final_doc_id}' in '{collection_name}'."
+        f"Successfully added {len(new_ids)} and updated metadata of "
+        f"{len(metadata_updates)} documents in '{collection_name}'."
     )
-    return final_doc_id
+    return doc_ids
+
+
+def _add_embedded(
+    memory_collection,
+    doc_ids: list[str],
+    texts: list[str],
+    metadatas: list[dict | None],
+) -> None:
+    """
+    Embeds and writes new documents in batches of CHROMA_ADD_BATCH_SIZE.
+    """
+    batch_size = config.CHROMA_ADD_BATCH_SIZE
+    batches = [
+        (start, start + batch_size) for start in range(0, len(doc_ids), batch_size)
+    ]
+
+    def embed(batch: tuple[int, int]):
+        start, end = batch
+        return _embedding_executor.submit(
+            llm_utils.generate_embeddings, texts[start:end], "RETRIEVAL_DOCUMENT"
+        )
+
+    # Keep one embedding request in flight ahead of each write, so every
+    # Chroma add overlaps with Gemini latency.
+    pending = embed(batches[0])
+    for i, (start, end) in enumerate(batches):
+        embeddings = pending.result()
+        if i + 1 < len(batches):
+            pending = embed(batches[i + 1])
+        memory_collection.add(
+            ids=doc_ids[start:end],
+            embeddings=embeddings,
+            documents=texts[start:end],
+            metadatas=metadatas[start:end],
+        )
 
 
 @handle_errors_as_mcp
+@database.retry_stale_collection
+@require_nonempty("query")
 def recall_memory(
     query: str,
     top_k: int = 1,
@@ -58,25 +250,20 @@ def recall_memory(
     Core logic for recalling relevant memory documents.
     Returns list of texts on success. Raises McpError on failure.
     """
-    logger.debug(f"Executing recall_memory logic for collection '{collection_name}'")
-    if not query:
-        raise ValueError("Query cannot be empty.")
+    logger.debug("Executing recall_memory logic for collection '%s'", collection_name)
+    return _recall_memory(query, top_k, filter, collection_name)
 
-    memory_collection = database.get_collection(collection_name)
-    query_embedding = llm_utils.generate_embedding(query, task_type="RETRIEVAL_QUERY")
 
-    results = memory_collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k,
-        where=filter,
-        include=["metadatas"],
-    )
+def _recall_memory(
+    query: str, top_k: int, filter: dict | None, collection_name: str
+) -> list[str]:
+    """
+    Undecorated recall used by other tools, so their errors are translated
+    once by the caller's handler instead of at every layer.
+    """
+    results = _query_collection(collection_name, query, top_k, filter, ["documents"])
 
-    retrieved_texts = []
-    if results and results.get("metadatas") and len(results["metadatas"]) > 0:
-        for metadata_item in results["metadatas"][0]:
-            if metadata_item and "original_text" in metadata_item:
-                retrieved_texts.append(metadata_item["original_text"])
+    retrieved_texts = _result_texts(collection_name, results)
 
     logger.info(
         f"Retrieved {len(retrieved_texts)} relevant text chunks from '{collection_name}'."
@@ -84,7 +271,66 @@ def recall_memory(
     return retrieved_texts
 
 
+def _query_collection(
+    collection_name: str,
+    query: str,
+    n_results: int,
+    filter: dict | None,
+    include: list[str],
+    where_document: dict | None = None,
+) -> dict:
+    """
+    Embeds the query once and runs a vector search against the collection.
+    Shared by the recall, summarize and check tools, so a query text already
+    seen by any of them is served from the embedding cache.
+    """
+    memory_collection = database.get_collection(collection_name)
+    query_embedding = llm_utils.generate_embedding(query, task_type="RETRIEVAL_QUERY")
+    return memory_collection.query(
+        query_embeddings=query_embedding[None, :],
+        n_results=n_results,
+        where=filter,
+        where_document=where_document,
+        include=include,
+    )
+
+
+def _result_texts(collection_name: str, results: dict) -> list[str]:
+    """
+    Texts of a single-query result, in rank order, skipping rows with no text.
+    """
+    ids = (results.get("ids") or [[]])[0]
+    documents = (results.get("documents") or [[]])[0]
+    texts = _resolve_texts(collection_name, ids, documents)
+    return [text for text in texts if text]
+
+
+def _resolve_texts(
+    collection_name: str, ids: list[str], documents: list[str | None]
+) -> list[str | None]:
+    """
+    Rows written before memory text moved to Chroma documents keep it only in
+    metadata["original_text"]. Fills those in with one extra get, made only
+    when such rows are present. Returns one entry per ID, None if no text.
+    """
+    missing = [doc_id for doc_id, document in zip(ids, documents) if document is None]
+    if not missing:
+        return documents
+    memory_collection = database.get_collection(collection_name)
+    legacy = memory_collection.get(ids=missing, include=["metadatas"])
+    originals = {
+        doc_id: (metadata or {}).get("original_text")
+        for doc_id, metadata in zip(legacy["ids"], legacy["metadatas"])
+    }
+    return [
+        originals.get(doc_id) if document is None else document
+        for doc_id, document in zip(ids, documents)
+    ]
+
+
 @handle_errors_as_mcp
+@database.retry_stale_collection
+@require_nonempty("doc_id")
 def delete_memory(
     doc_id: str, collection_name: str = config.DEFAULT_COLLECTION_NAME
 ) -> bool:
@@ -93,11 +339,10 @@ def delete_memory(
     Returns True on success. Raises McpError on failure.
     """
     logger.debug(
-        f"Executing delete_memory logic for doc_id '{doc_id}' in collection '{collection_name}'"
+        "Executing delete_memory logic for doc_id '%s' in collection '%s'",
+        doc_id,
+        collection_name,
     )
-    if not doc_id:
-        raise ValueError("doc_id cannot be empty.")
-
     memory_collection = database.get_collection(collection_name)
 
     memory_collection.delete(ids=[doc_id])
@@ -106,6 +351,8 @@ def delete_memory(
 
 
 @handle_errors_as_mcp
+@database.retry_stale_collection
+@require_nonempty("query")
 def summarize_memory(
     query: str,
     top_k: int = 5,
@@ -116,23 +363,33 @@ def summarize_memory(
     Core logic for recalling and summarizing memories.
     Returns summary string on success, empty string if no context. Raises McpError on failure.
     """
-    logger.debug(f"Executing summarize_memory logic for collection '{collection_name}'")
-    if not query:
-        raise ValueError("Query cannot be empty.")
+    logger.debug(
+        "Executing summarize_memory logic for collection '%s'", collection_name
+    )
+    return _summarize_memory(query, top_k, filter, collection_name)
+
 
+def _summarize_memory(
+    query: str, top_k: int, filter: dict | None, collection_name: str
+) -> str:
+    """
+    Undecorated summarize used by summarize_collection, mirroring _recall_memory.
+    """
     # Step 1: Recall relevant info (will raise exceptions on failure)
-    retrieved_texts = recall_memory(
-        query=query, top_k=top_k, filter=filter, collection_name=collection_name
-    )
+    retrieved_texts = _recall_memory(query, top_k, filter, collection_name)
 
     if not retrieved_texts:
-        logger.warning(
-            f"No context found for summarization query in '{collection_name}'."
+        logger.debug(
+            "No context found for summarization query in '%s'.", collection_name
         )
         return ""  # Return empty string for no context
 
     # Step 2: Combine and Summarize (will raise exceptions on failure)
-    combined_chunks = "\n---\n".join(retrieved_texts)
+    combined_chunks = _CHUNK_SEPARATOR.join(retrieved_texts)
+    if len(combined_chunks) < config.SUMMARY_SHORTCIRCUIT_CHARS:
+        # Too short to be worth a model call; return the context verbatim
+        logger.info(f"Returned short context unsummarized for '{collection_name}'.")
+        return combined_chunks
     summary = llm_utils.generate_summary(combined_chunks, query)
 
     logger.info(f"Generated summary for query in '{collection_name}'.")
@@ -140,30 +397,39 @@ def summarize_memory(
 
 
 @handle_errors_as_mcp
+@database.retry_stale_collection
 def check_memory(
-    topic: str,
+    topic: str = "",
     filter: dict | None = None,
     collection_name: str = config.DEFAULT_COLLECTION_NAME,
+    semantic: bool = True,
 ) -> bool:
     """
     Core logic for checking memory existence.
+    With semantic=False or an empty topic, only checks whether any document
+    matches the filter, skipping the embedding and the vector search entirely;
+    the topic is then used only for logging.
     Returns True/False on success. Raises McpError on failure.
     """
     logger.debug(
-        f"Executing check_memory logic for topic '{topic}' in collection '{collection_name}'"
+        "Executing check_memory logic for topic '%s' in collection '%s'",
+        topic,
+        collection_name,
     )
-    if not topic:
-        raise ValueError("Topic cannot be empty.")
-
-    memory_collection = database.get_collection(collection_name)
-    query_embedding = llm_utils.generate_embedding(topic, task_type="RETRIEVAL_QUERY")
+    topic = topic.strip()
+    if semantic and not topic and not filter:
+        raise ValueError("Topic cannot be empty when no filter is given.")
+
+    if not semantic or not topic:
+        memory_collection = database.get_collection(collection_name)
+        results = memory_collection.get(where=filter, limit=1, include=[])
+        exists = bool(results and results.get("ids"))
+        logger.info(
+            f"Check memory result for topic '{topic}' (filter only) in '{collection_name}': {exists}"
+        )
+        return exists
 
-    results = memory_collection.query(
-        query_embeddings=[query_embedding],
-        n_results=1,
-        where=filter,
-        include=[],
-    )
+    results = _query_collection(collection_name, topic, 1, filter, [])
     exists = bool(results and results.get("ids") and results["ids"][0])
     logger.info(
         f"Check memory result for topic '{topic}' in '{collection_name}': {exists}"
@@ -172,47 +438,134 @@ def check_memory(
 
 
 @handle_errors_as_mcp
+@database.retry_stale_collection
+@require_nonempty("doc_id")
+def check_memory_by_id(
+    doc_id: str, collection_name: str = config.DEFAULT_COLLECTION_NAME
+) -> bool:
+    """
+    Core logic for checking whether a memory document with the given ID exists.
+    Looks the ID up directly, with no embedding or vector search.
+    Returns True/False on success. Raises McpError on failure.
+    """
+    logger.debug(
+        "Executing check_memory_by_id logic for doc_id '%s' in collection '%s'",
+        doc_id,
+        collection_name,
+    )
+    memory_collection = database.get_collection(collection_name)
+    results = memory_collection.get(ids=[doc_id], limit=1, include=[])
+    exists = bool(results and results.get("ids"))
+    logger.info(
+        f"Check memory result for doc_id '{doc_id}' in '{collection_name}': {exists}"
+    )
+    return exists
+
+
+@handle_errors_as_mcp
+@database.retry_stale_collection
+@require_nonempty("collection_name")
 def summarize_collection(collection_name: str, query: str = "") -> str:
     """
     Core logic for summarizing an entire collection. The query is optional.
+    With a query, summarizes the most relevant documents. Without one, pages
+    through the collection, summarizes each page and then the page summaries,
+    stopping once SUMMARY_TOKEN_BUDGET is used up.
     Returns summary string on success, empty string if no context. Raises McpError on failure.
     """
     logger.debug(
-        f"Executing summarize_collection logic for collection '{collection_name}'"
+        "Executing summarize_collection logic for collection '%s'", collection_name
     )
-    if not collection_name:
-        raise ValueError("Collection name cannot be empty.")
+    if query:
+        return _summarize_memory(
+            query, config.SUMMARY_MAX_CONTEXT_DOCS, None, collection_name
+        )
 
-    # Step 1: Retrieve all documents from the collection
+    # Step 1 (map): Summarize pages concurrently as they stream in, keeping at
+    # most SUMMARY_MAP_CONCURRENCY pages queued so memory stays bounded
     memory_collection = database.get_collection(collection_name)
-    results = memory_collection.get(include=["metadatas"])
-
-    if not results or not results.get("metadatas"):
-        logger.warning(
-            f"No documents found in collection '{collection_name}' for summarization."
+    page_summaries = []
+    in_flight: deque[Future] = deque()
+    try:
+        for page_texts in _iter_page_texts(memory_collection, collection_name):
+            if len(in_flight) >= config.SUMMARY_MAP_CONCURRENCY:
+                page_summaries.append(in_flight.popleft().result())
+            in_flight.append(
+                _summary_executor.submit(
+                    llm_utils.generate_summary,
+                    _CHUNK_SEPARATOR.join(page_texts),
+                    query,
+                )
+            )
+        while in_flight:
+            page_summaries.append(in_flight.popleft().result())
+    except Exception:
+        # Don't leave queued Gemini calls running for a failed tool call
+        for future in in_flight:
+            future.cancel()
+        raise
+
+    if not page_summaries:
+        logger.debug(
+            "No text content found in collection '%s' for summarization.",
+            collection_name,
         )
         return ""
 
-    retrieved_texts = []
-    for metadata_item in results["metadatas"]:
-        if metadata_item and "original_text" in metadata_item:
-            retrieved_texts.append(metadata_item["original_text"])
-
-    if not retrieved_texts:
-        logger.warning(
-            f"No text content found in collection '{collection_name}' for summarization."
+    # Step 2 (reduce): Combine the page summaries
+    if len(page_summaries) == 1:
+        summary = page_summaries[0]
+    else:
+        summary = llm_utils.generate_summary(
+            _CHUNK_SEPARATOR.join(page_summaries), query
         )
-        return ""
-
-    # Step 2: Combine and Summarize
-    combined_chunks = "\\n---\\n".join(retrieved_texts)
-    summary = llm_utils.generate_summary(combined_chunks, query)
 
     logger.info(f"Generated summary for collection '{collection_name}'.")
     return summary
 
 
+def _iter_page_texts(memory_collection, collection_name: str) -> Iterator[list[str]]:
+    """
+    Streams a collection's documents in pages of SUMMARY_PAGE_SIZE, fetching
+    the next page only when the caller asks for it. Stops once
+    SUMMARY_TOKEN_BUDGET is spent.
+    """
+    page_size = config.SUMMARY_PAGE_SIZE
+    token_budget = config.SUMMARY_TOKEN_BUDGET
+    offset = 0
+    while True:
+        page = memory_collection.get(
+            limit=page_size, offset=offset, include=["documents"]
+        )
+        if not page or not page.get("ids"):
+            return
+        offset += len(page["ids"])
+
+        page_texts = []
+        documents = _resolve_texts(collection_name, page["ids"], page["documents"])
+        for document in documents:
+            if not document:
+                continue
+            token_budget -= len(document) // 4  # Rough chars-per-token estimate
+            if token_budget < 0:
+                logger.warning(
+                    f"Token budget reached; summarizing only part of '{collection_name}'."
+                )
+                if page_texts:
+                    yield page_texts
+                return
+            page_texts.append(document)
+
+        if page_texts:
+            yield page_texts
+        # A short page is the last one; skip the extra empty round trip
+        if len(page["ids"]) < page_size:
+            return
+
+
 @handle_errors_as_mcp
+@database.retry_stale_collection
+@require_nonempty("doc_id")
 def update_memory_metadata(
     doc_id: str,
     metadata: dict,
@@ -223,29 +576,22 @@ def update_memory_metadata(
     Returns True on success. Raises McpError on failure.
     """
     logger.debug(
-        f"Executing update_memory_metadata logic for doc_id '{doc_id}' in collection '{collection_name}'"
+        "Executing update_memory_metadata logic for doc_id '%s' in collection '%s'",
+        doc_id,
+        collection_name,
     )
-    if not doc_id:
-        raise ValueError("doc_id cannot be empty.")
     if not metadata or not isinstance(metadata, dict):
         raise ValueError("Metadata must be a non-empty dictionary.")
 
     memory_collection = database.get_collection(collection_name)
-    # Fetch the existing document to preserve the embedding
-    results = memory_collection.get(ids=[doc_id], include=["embeddings"])
-    if not results or not results["embeddings"] or not results["embeddings"][0]:
+    # IDs-only lookup for the existence check; update() keeps the stored embedding
+    results = memory_collection.get(ids=[doc_id], include=[])
+    if not results or not results["ids"]:
         raise ValueError(
             f"Document with id '{doc_id}' not found in collection '{collection_name}'."
         )
 
-    embedding = results["embeddings"][0]
-
-    # Update the metadata
-    memory_collection.update(
-        ids=[doc_id],
-        metadatas=[metadata],
-        embeddings=[embedding],  # embeddings must be passed during update
-    )
+    memory_collection.update(ids=[doc_id], metadatas=[metadata])
 
     logger.info(
         f"Successfully updated metadata for document '{doc_id}' in '{collection_name}'."
@@ -254,6 +600,8 @@ def update_memory_metadata(
 
 
 @handle_errors_as_mcp
+@database.retry_stale_collection
+@require_nonempty("doc_id")
 def get_memory_by_id(
     doc_id: str, collection_name: str = config.DEFAULT_COLLECTION_NAME
 ) -> str:
@@ -262,28 +610,29 @@ def get_memory_by_id(
     Returns the document's text content on success, empty string if not found.
     """
     logger.debug(
-        f"Executing get_memory_by_id logic for doc_id '{doc_id}' in collection '{collection_name}'"
+        "Executing get_memory_by_id logic for doc_id '%s' in collection '%s'",
+        doc_id,
+        collection_name,
     )
-    if not doc_id:
-        raise ValueError("doc_id cannot be empty.")
-
     memory_collection = database.get_collection(collection_name)
-    results = memory_collection.get(
-        ids=[doc_id], include=["metadatas"]
-    )  # Only fetch metadata
+    results = memory_collection.get(ids=[doc_id], include=["documents"])
 
-    if not results or not results["metadatas"] or not results["metadatas"][0]:
-        logger.warning(
-            f"Document with id '{doc_id}' not found in collection '{collection_name}'."
+    if not results or not results["ids"]:
+        logger.debug(
+            "Document with id '%s' not found in collection '%s'.",
+            doc_id,
+            collection_name,
         )
         return ""  # Return empty string if not found
 
-    metadata = results["metadatas"][0][0]  # Access the first document's metadata
-    if metadata and "original_text" in metadata:
-        return metadata["original_text"]
+    document = _resolve_texts(collection_name, results["ids"], results["documents"])[0]
+    if document:
+        return document
     else:
-        logger.warning(
-            f"No text content found for document '{doc_id}' in collection '{collection_name}'."
+        logger.debug(
+            "No text content found for document '%s' in collection '%s'.",
+            doc_id,
+            collection_name,
         )
         return ""  # Return empty string if no text content
 
@@ -300,6 +649,8 @@ def list_collections() -> list[str]:
 
 
 @handle_errors_as_mcp
+@database.retry_stale_collection
+@require_nonempty("query")
 def recall_memory_with_distance(
     query: str,
     top_k: int = 1,
@@ -311,33 +662,20 @@ def recall_memory_with_distance(
     Returns a list of tuples, where each tuple contains the text and the distance.
     """
     logger.debug(
-        f"Executing recall_memory_with_distance logic for collection '{collection_name}'"
+        "Executing recall_memory_with_distance logic for collection '%s'",
+        collection_name,
     )
-    if not query:
-        raise ValueError("Query cannot be empty.")
-
-    memory_collection = database.get_collection(collection_name)
-    query_embedding = llm_utils.generate_embedding(query, task_type="RETRIEVAL_QUERY")
-
-    results = memory_collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k,
-        where=filter,
-        include=["metadatas", "distances"],
+    results = _query_collection(
+        collection_name, query, top_k, filter, ["documents", "distances"]
     )
 
-    retrieved_texts = []
-    if (
-        results
-        and results.get("metadatas")
-        and results.get("distances")
-        and len(results["metadatas"]) > 0
-    ):
-        for i, metadata_item in enumerate(results["metadatas"][0]):
-            if metadata_item and "original_text" in metadata_item:
-                text = metadata_item["original_text"]
-                distance = results["distances"][0][i]
-                retrieved_texts.append((text, distance))
+    ids = (results.get("ids") or [[]])[0]
+    documents = (results.get("documents") or [[]])[0]
+    distances = (results.get("distances") or [[]])[0]
+    texts = _resolve_texts(collection_name, ids, documents)
+    retrieved_texts = [
+        (text, distance) for text, distance in zip(texts, distances) if text
+    ]
 
     logger.info(
         f"Retrieved {len(retrieved_texts)} relevant text chunks from '{collection_name}'."
@@ -346,6 +684,8 @@ def recall_memory_with_distance(
 
 
 @handle_errors_as_mcp
+@database.retry_stale_collection
+@require_nonempty("query")
 def recall_memory_hybrid(
     query: str,
     keyword: str = None,
@@ -358,31 +698,19 @@ def recall_memory_hybrid(
     Returns a list of texts.
     """
     logger.debug(
-        f"Executing recall_memory_hybrid logic for collection '{collection_name}'"
+        "Executing recall_memory_hybrid logic for collection '%s'", collection_name
     )
-    if not query:
-        raise ValueError("Query cannot be empty.")
-
-    memory_collection = database.get_collection(collection_name)
-    query_embedding = llm_utils.generate_embedding(query, task_type="RETRIEVAL_QUERY")
-
-    # Basic hybrid search (can be improved with more sophisticated techniques)
-    results = memory_collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k,
-        where=filter,
-        include=["metadatas"],
+    # The keyword is matched against stored documents by Chroma during the query
+    results = _query_collection(
+        collection_name,
+        query,
+        top_k,
+        filter,
+        ["documents"],
+        where_document={"$contains": keyword} if keyword else None,
     )
 
-    retrieved_texts = []
-    if results and results.get("metadatas") and len(results["metadatas"]) > 0:
-        for metadata_item in results["metadatas"][0]:
-            if metadata_item and "original_text" in metadata_item:
-                text = metadata_item["original_text"]
-                if (
-                    keyword is None or keyword.lower() in text.lower()
-                ):  # Basic keyword filter
-                    retrieved_texts.append(text)
+    retrieved_texts = _result_texts(collection_name, results)
 
     logger.info(
         f"Retrieved {len(retrieved_texts)} relevant text chunks from '{collection_name}'."
@@ -392,39 +720,37 @@ def recall_memory_hybrid(
 
 @require_privilege
 @handle_errors_as_mcp
+@require_nonempty("collection_name")
 def delete_collection(collection_name: str) -> bool:
     """
     Core logic for deleting an entire collection. Requires privilege.
     Returns True on success. Raises McpError on failure.
     """
     logger.debug(
-        f"Executing delete_collection logic for collection '{collection_name}'"
+        "Executing delete_collection logic for collection '%s'", collection_name
     )
-    if not collection_name:
-        raise ValueError("Collection name cannot be empty.")
-
     database.chroma_client.delete_collection(name=collection_name)
+    database.evict_collection(collection_name)
     logger.info(f"Attempted deletion of collection '{collection_name}'.")
     return True
 
 
 @handle_errors_as_mcp
+@database.retry_stale_collection
+@require_nonempty("collection_name")
 def list_collection_ids(collection_name: str) -> list[str]:
     """
     Core logic for listing all document IDs in a collection.
     Returns a list of document IDs.
     """
     logger.debug(
-        f"Executing list_collection_ids logic for collection '{collection_name}'"
+        "Executing list_collection_ids logic for collection '%s'", collection_name
     )
-    if not collection_name:
-        raise ValueError("Collection name cannot be empty.")
-
     memory_collection = database.get_collection(collection_name)
     results = memory_collection.get(include=[])
 
     if not results or not results.get("ids"):
-        logger.warning(f"No documents found in collection '{collection_name}'.")
+        logger.debug("No documents found in collection '%s'.", collection_name)
         return []
 
     ids = results["ids"]